@@ -10,12 +10,50 @@ import json
 import types
 from collections import OrderedDict
 from importlib import import_module
-from os import listdir, makedirs
-from os.path import isdir, join
+from os import makedirs, scandir
+from os.path import isdir, isfile, join
+from pathlib import Path
+from string import Template
 from textwrap import dedent
 
 _INDENT = " " * 4
 
+# Templates for the package pages, that are filled for each package
+_PACKAGE_TEMPLATE = Template(
+    dedent("""
+
+    ``${package}``
+    ${underline}
+    .. currentmodule:: ${package}
+
+    .. automodule:: ${package}
+
+    .. currentmodule:: ${package}
+
+""")
+)
+_CATEGORY_TEMPLATE = Template(
+    dedent("""
+
+    ${category}
+    ${underline}
+
+    .. autosummary::
+        :nosignatures:
+        :toctree:
+
+""")
+    + "${attributes}"
+)
+_SUBPACKAGES_HEADER = dedent("""
+
+    Subpackages
+    -----------
+
+    .. autosummary::
+
+""")
+
 
 # The categories for functions and classes on the module pages
 # from biotite/doc/apidoc.json
@@ -48,8 +86,8 @@ def _create_package_doc(pck, src_path, doc_path):
         # -> Nothing to do
         return []
     # Identify all subdirectories...
-    content = listdir(src_path)
-    dirs = [f for f in content if isdir(join(src_path, f))]
+    with scandir(src_path) as entries:
+        dirs = [entry.name for entry in entries if entry.is_dir()]
     # ... and recursively create also the documentation for them
     sub_pck = []
     for directory in dirs:
@@ -57,27 +95,21 @@ def _create_package_doc(pck, src_path, doc_path):
             f"{pck}.{directory}", join(src_path, directory), doc_path
         )
 
-    # Import package (__init__.py) and find all attribute names
+    # Import package (__init__.py) and find all attributes
     module = import_module(pck)
-    attr_list = dir(module)
-    # Classify attribute names into classes and functions
-    class_list = [
-        attr
-        for attr in attr_list
-        # Do not document private classes
+    members = [
+        (attr, getattr(module, attr))
+        for attr in dir(module)
+        # Do not document private attributes
         if attr[0] != "_"
-        # Check if object is a class
-        and isinstance(getattr(module, attr), type)
     ]
+    # Classify attributes into classes and functions
+    class_list = [attr for attr, obj in members if isinstance(obj, type)]
     func_list = [
         attr
-        for attr in attr_list
-        # Do not document private classes
-        if attr[0] != "_"
-        # All functions are callable...
-        and callable(getattr(module, attr))
-        # ...but classes are also callable
-        and attr not in class_list
+        for attr, obj in members
+        # All functions are callable, but classes are also callable
+        if callable(obj) and not isinstance(obj, type)
     ]
     # Create *.rst files
     _create_package_page(doc_path, pck, class_list, func_list, sub_pck)
@@ -113,56 +145,36 @@ def _create_package_page(doc_path, package_name, classes, functions, subpackages
         categories[misc_category_name] = misc_attributes
 
     # String for categorized class and function enumeration
-    category_strings = []
-    for category, attrs in categories.items():
-        # Create string for each category
-        string = dedent(f"""
-
-            {category}
-            {"-"*len(category)}
-
-            .. autosummary::
-                :nosignatures:
-                :toctree:
-
-        """)
-        string += "\n".join([_INDENT + attr for attr in attrs])
-        category_strings.append(string)
-    # Concatenate strings
-    attributes_string = "\n".join(category_strings)
-
-    # String for subpackage enumeration
-    subpackages_string = "\n".join([_INDENT + pck for pck in subpackages])
+    attributes_string = "\n".join(
+        [
+            _CATEGORY_TEMPLATE.substitute(
+                category=category,
+                underline=_underline(category, "-"),
+                attributes="\n".join([_INDENT + attr for attr in attrs]),
+            )
+            for category, attrs in categories.items()
+        ]
+    )
 
     # Assemble page
     file_content = (
-        dedent(f"""
-
-        ``{package_name}``
-        {"=" * (len(package_name) + 4)}
-        .. currentmodule:: {package_name}
-
-        .. automodule:: {package_name}
-
-        .. currentmodule:: {package_name}
-
-    """)
+        _PACKAGE_TEMPLATE.substitute(
+            package=package_name,
+            # Consider the two backticks on each side of the title
+            underline=_underline(package_name, "=", 4),
+        )
         + attributes_string
     )
     if len(subpackages) > 0:
-        file_content += (
-            dedent("""
+        # String for subpackage enumeration
+        file_content += _SUBPACKAGES_HEADER + "\n".join(
+            [_INDENT + pck for pck in subpackages]
+        )
+    _write_page(join(doc_path, f"{package_name}.rst"), file_content)
 
-        Subpackages
-        -----------
 
-        .. autosummary::
-
-    """)
-            + subpackages_string
-        )
-    with open(join(doc_path, f"{package_name}.rst"), "w") as f:
-        f.write(file_content)
+def _underline(title, character, extra_length=0):
+    return character * (len(title) + extra_length)
 
 
 def _create_class_page(doc_path, package_name, class_name):
@@ -181,8 +193,7 @@ def _create_class_page(doc_path, package_name, class_name):
             :add-heading: Gallery
             :heading-level: "
     """)
-    with open(join(doc_path, f"{package_name}.{class_name}.rst"), "w") as f:
-        f.write(file_content)
+    _write_page(join(doc_path, f"{package_name}.{class_name}.rst"), file_content)
 
 
 def _create_function_page(doc_path, package_name, function_name):
@@ -196,8 +207,7 @@ def _create_function_page(doc_path, package_name, function_name):
             :add-heading: Gallery
             :heading-level: "
     """)
-    with open(join(doc_path, f"{package_name}.{function_name}.rst"), "w") as f:
-        f.write(file_content)
+    _write_page(join(doc_path, f"{package_name}.{function_name}.rst"), file_content)
 
 
 def _create_package_index(doc_path, package_list):
@@ -215,13 +225,24 @@ def _create_package_index(doc_path, package_list):
     """)
         + packages_string
     )
-    with open(join(doc_path, "index.rst"), "w") as f:
-        f.write(file_content)
+    _write_page(join(doc_path, "index.rst"), file_content)
+
+
+def _write_page(path, content):
+    """
+    Write the content of an *.rst file.
+
+    The file is only written, if its content changed, so that *Sphinx*
+    does not need to reread unchanged pages in incremental builds.
+    """
+    path = Path(path)
+    if path.is_file() and path.read_text() == content:
+        return
+    path.write_text(content)
 
 
 def _is_package(path):
-    content = listdir(path)
-    return "__init__.py" in content
+    return isfile(join(path, "__init__.py"))
 
 
 def skip_nonrelevant(app, what, name, obj, skip, options):
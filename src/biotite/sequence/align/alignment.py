@@ -273,16 +273,14 @@ def get_codes(alignment):
     sequences = alignment.sequences
 
     # The number of sequences is the first dimension
-    codes = np.zeros((trace.shape[1], trace.shape[0]), dtype=np.int64)
-    for i in range(len(sequences)):
-        # Mark -1 explicitly as int64 to avoid that the unsigned dtype
-        # of the sequence code is used
-        # (https://numpy.org/neps/nep-0050-scalar-promotion.html)
-        codes[i] = np.where(
-            trace[:, i] != -1, sequences[i].code[trace[:, i]], np.int64(-1)
-        )
-
-    return np.stack(codes)
+    # Gaps are represented by -1
+    codes = np.full((trace.shape[1], trace.shape[0]), -1, dtype=np.int64)
+    for i, sequence in enumerate(sequences):
+        seq_trace = trace[:, i]
+        is_not_gap = seq_trace != -1
+        codes[i, is_not_gap] = sequence.code[seq_trace[is_not_gap]]
+
+    return codes
 
 
 def get_symbols(alignment):
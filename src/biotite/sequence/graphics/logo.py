@@ -9,7 +9,6 @@ __all__ = ["plot_sequence_logo"]
 import numpy as np
 from biotite.sequence.alphabet import LetterAlphabet
 from biotite.sequence.graphics.colorschemes import get_color_scheme
-from biotite.visualize import set_font_size_in_coord
 
 
 def plot_sequence_logo(axes, profile, scheme=None, **kwargs):
@@ -38,13 +37,23 @@ def plot_sequence_logo(axes, profile, scheme=None, **kwargs):
         The list length must be at least as long as the
         length of the alphabet used by the `profile`.
     **kwargs
-        Additional `text parameters <https://matplotlib.org/api/text_api.html#matplotlib.text.Text>`_.
+        Additional font properties (e.g. ``family``, ``weight``) or
+        `collection parameters <https://matplotlib.org/stable/api/collections_api.html#matplotlib.collections.PathCollection>`_.
+
+    Notes
+    -----
+    All symbols are drawn as a single :class:`PathCollection`, where
+    each symbol is scaled exactly to the width of a column and its
+    height in the stack.
 
     References
     ----------
 
     .. footbibliography::
     """
+    from matplotlib.collections import PathCollection
+    from matplotlib.path import Path
+
     alphabet = profile.alphabet
     if not isinstance(alphabet, LetterAlphabet):
         raise TypeError("The sequences' alphabet must be a letter alphabet")
@@ -56,49 +65,103 @@ def plot_sequence_logo(axes, profile, scheme=None, **kwargs):
     else:
         colors = scheme
 
-    # 'color' and 'size' property is not passed on to text
+    # 'color' and 'size' property is not passed on to the collection
     kwargs.pop("color", None)
     kwargs.pop("size", None)
+    font = _pop_font_properties(kwargs)
 
     frequencies, entropies, max_entropy = _get_entropy(profile)
     stack_heights = max_entropy - entropies
-    symbols_heights = stack_heights[:, np.newaxis] * frequencies
+    # Positions without any visible symbol (e.g. only gaps) are skipped
+    active_positions = np.nonzero(stack_heights > 0)[0]
+    symbols_heights = (
+        stack_heights[active_positions, np.newaxis] * frequencies[active_positions]
+    )
     index_order = np.argsort(symbols_heights, axis=1)
-    for i in range(symbols_heights.shape[0]):
-        # Iterate over the alignment columns
-        index_order = np.argsort(symbols_heights)
-        start_height = 0
-        for j in index_order[i]:
-            # Stack the symbols at position on top of the preceeding one
-            height = symbols_heights[i, j]
-            if height > 0:
-                symbol = alphabet.decode(j)
-                text = axes.text(
-                    i + 0.5,
-                    start_height,
-                    symbol,
-                    ha="left",
-                    va="bottom",
-                    color=colors[j],
-                    # Best results are obtained with this font size
-                    size=1,
-                    **kwargs,
-                )
-                text.set_clip_on(True)
-                set_font_size_in_coord(text, width=1, height=height)
-                start_height += height
+    sorted_heights = np.take_along_axis(symbols_heights, index_order, axis=1)
+    # Stack the symbols at each position on top of the preceeding ones
+    start_heights = np.cumsum(sorted_heights, axis=1) - sorted_heights
+    # Only symbols with a visible height are drawn
+    active_indices, ranks = np.nonzero(sorted_heights > 0)
+    positions = active_positions[active_indices]
+    symbol_codes = index_order[active_indices, ranks]
+    heights = sorted_heights[active_indices, ranks]
+    start_heights = start_heights[active_indices, ranks]
+
+    paths = []
+    path_colors = []
+    for j in np.unique(symbol_codes):
+        # Each glyph is created only once and is scaled and translated
+        # to all positions of the symbol at once
+        glyph = _create_unit_glyph(alphabet.decode(j), font)
+        is_symbol = symbol_codes == j
+        vertices = np.repeat(
+            glyph.vertices[np.newaxis, :, :], np.count_nonzero(is_symbol), axis=0
+        )
+        vertices[..., 1] *= heights[is_symbol, np.newaxis]
+        vertices[..., 0] += positions[is_symbol, np.newaxis] + 0.5
+        vertices[..., 1] += start_heights[is_symbol, np.newaxis]
+        paths += [Path(glyph_vertices, glyph.codes) for glyph_vertices in vertices]
+        path_colors += [colors[j]] * len(vertices)
+
+    collection = PathCollection(
+        paths,
+        facecolors=path_colors,
+        edgecolors="none",
+        transform=axes.transData,
+        **kwargs,
+    )
+    axes.add_collection(collection)
 
     axes.set_xlim(0.5, len(profile.symbols) + 0.5)
     axes.set_ylim(0, max_entropy)
 
 
+def _pop_font_properties(kwargs):
+    """
+    Remove the font related parameters from the given keyword arguments
+    and create :class:`FontProperties` from them.
+    """
+    from matplotlib.font_manager import FontProperties
+
+    font = kwargs.pop("fontproperties", kwargs.pop("font", None))
+    if font is not None:
+        return font if isinstance(font, FontProperties) else FontProperties(font)
+    properties = {}
+    for name in ["family", "style", "variant", "weight", "stretch"]:
+        # Both, e.g. 'weight' and 'fontweight' are valid parameter names
+        value = kwargs.pop(name, kwargs.pop("font" + name, None))
+        if value is not None:
+            properties[name] = value
+    return FontProperties(**properties)
+
+
+def _create_unit_glyph(symbol, font):
+    """
+    Create the path of the given symbol, scaled to a width and height
+    of 1 with the lower left corner at the origin.
+
+    The width includes the spacing around the glyph, so that narrow
+    symbols such as ``I`` are not stretched to the full width.
+    """
+    from matplotlib.textpath import TextPath, text_to_path
+    from matplotlib.transforms import Affine2D
+
+    font = font.copy()
+    font.set_size(1)
+    path = TextPath((0, 0), symbol, prop=font)
+    width, _, _ = text_to_path.get_text_width_height_descent(symbol, font, ismath=False)
+    bbox = path.get_extents()
+    return path.transformed(
+        Affine2D().translate(0, -bbox.y0).scale(1 / width, 1 / bbox.height)
+    )
+
+
 def _get_entropy(profile):
     freq = profile.symbols
     freq = freq / np.sum(freq, axis=1)[:, np.newaxis]
-    # 0 * log2(0) = 0 -> Convert NaN to 0
-    no_zeros = freq != 0
-    pre_entropies = np.zeros(freq.shape)
-    pre_entropies[no_zeros] = freq[no_zeros] * np.log2(freq[no_zeros])
-    entropies = -np.sum(pre_entropies, axis=1)
+    # 0 * log2(0) = 0 -> Leave logarithm of zero frequencies at 0
+    log_freq = np.log2(freq, out=np.zeros(freq.shape), where=freq != 0)
+    entropies = -np.einsum("ij,ij->i", freq, log_freq)
     max_entropy = np.log2(len(profile.alphabet))
     return freq, entropies, max_entropy
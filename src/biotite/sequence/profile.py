@@ -228,14 +228,18 @@ class SequenceProfile(object):
                         "The given alphabet is incompatible with a least one "
                         "alphabet of the given sequences"
                     )
-        symbols = np.zeros((len(sequences[0]), len(alphabet)), dtype=int)
-        gaps = np.zeros(len(sequences[0]), dtype=int)
-        sequences = np.transpose(sequences)
-        for i in range(len(sequences)):
-            row = np.where(sequences[i,] == -1, len(alphabet), sequences[i,])
-            count = np.bincount(row, minlength=len(alphabet) + 1)
-            symbols[i,] = count[0 : len(alphabet)]
-            gaps[i] = count[-1]
+        n_positions = sequences.shape[1]
+        # Gaps are counted as an additional symbol after the alphabet
+        n_bins = len(alphabet) + 1
+        sequences = np.where(sequences == -1, len(alphabet), sequences)
+        # Count all positions at once:
+        # Each position gets its own range of bins
+        bins = np.arange(n_positions) * n_bins + sequences
+        count = np.bincount(bins.ravel(), minlength=n_positions * n_bins).reshape(
+            n_positions, n_bins
+        )
+        symbols = count[:, : len(alphabet)]
+        gaps = count[:, -1]
         return SequenceProfile(symbols, gaps, alphabet)
 
     def to_consensus(self, as_general=False):
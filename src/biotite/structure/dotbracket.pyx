@@ -11,15 +11,38 @@ __name__ = "biotite.structure"
 __author__ = "Tom David Müller"
 __all__ = ["dot_bracket_from_structure", "dot_bracket", "base_pairs_from_dot_bracket"]
 
+cimport cython
+cimport numpy as np
+
 import numpy as np
-from biotite.structure.basepairs import base_pairs
-from biotite.structure.pseudoknots import pseudoknots
-from biotite.structure.residues import get_residue_count, get_residue_positions
+from .basepairs import base_pairs
+from .pseudoknots import pseudoknots
+from .residues import get_residue_count, get_residue_positions
+
+ctypedef np.int8_t int8
+ctypedef np.int64_t int64
+
 
 _OPENING_BRACKETS = "([{<ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 _OPENING_BRACKETS_BYTES = _OPENING_BRACKETS.encode()
 _CLOSING_BRACKETS = ")]}>abcdefghijklmnopqrstuvwxyz"
 _CLOSING_BRACKETS_BYTES = _CLOSING_BRACKETS.encode()
+_OPENING_BRACKET_CODES = np.frombuffer(_OPENING_BRACKETS_BYTES, dtype=np.uint8)
+_CLOSING_BRACKET_CODES = np.frombuffer(_CLOSING_BRACKETS_BYTES, dtype=np.uint8)
+
+
+def _create_bracket_table(bracket_codes):
+    """
+    Create a lookup table that maps each ASCII code to the index of the
+    corresponding bracket type or to -1 if it is not a bracket.
+    """
+    table = np.full(256, -1, dtype=np.int8)
+    table[bracket_codes] = np.arange(len(bracket_codes))
+    return table
+
+
+_OPENING_TABLE = _create_bracket_table(_OPENING_BRACKET_CODES)
+_CLOSING_TABLE = _create_bracket_table(_CLOSING_BRACKET_CODES)
 
 
 def dot_bracket_from_structure(
@@ -130,17 +153,29 @@ def dot_bracket(basepairs, length, scores=None, max_pseudoknot_order=None):
 
     # Each optimal pseudoknot order solution is represented in
     # dot-bracket-notation
-    notations = [bytearray((b"." * length)) for _ in range(len(pseudoknot_order))]
-    for s, solution in enumerate(pseudoknot_order):
-        for basepair, order in zip(basepairs, solution):
-            if order == -1:
-                continue
-            notations[s][basepair[0]] = _OPENING_BRACKETS_BYTES[order]
-            notations[s][basepair[1]] = _CLOSING_BRACKETS_BYTES[order]
-    return [notation.decode() for notation in notations]
-
-
-def base_pairs_from_dot_bracket(dot_bracket_notation):
+    # The notations of all solutions are written at once
+    notations = np.full((len(pseudoknot_order), length), ord("."), dtype=np.uint8)
+    # Base pairs with order -1 are represented as unpaired
+    solution_indices, basepair_indices = np.nonzero(pseudoknot_order != -1)
+    order = pseudoknot_order[solution_indices, basepair_indices]
+    notations[solution_indices, basepairs[basepair_indices, 0]] = (
+        _OPENING_BRACKET_CODES[order]
+    )
+    notations[solution_indices, basepairs[basepair_indices, 1]] = (
+        _CLOSING_BRACKET_CODES[order]
+    )
+    # Decode the notations of all solutions in a single pass
+    # and split them afterwards
+    all_notations = notations.tobytes().decode("ascii")
+    return [
+        all_notations[i * length : (i + 1) * length]
+        for i in range(len(pseudoknot_order))
+    ]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def base_pairs_from_dot_bracket(str dot_bracket_notation):
     """
     Extract the base pairs from a nucleic-acid-strand in
     dot-bracket-letter-notation (DBL-notation). :footcite:`Antczak2018`
@@ -177,38 +212,70 @@ def base_pairs_from_dot_bracket(dot_bracket_notation):
 
     .. footbibliography::
     """
-    basepairs = []
-    opened_brackets = [[] for _ in range(len(_OPENING_BRACKETS))]
-
+    cdef bytes notation_bytes
+    try:
+        notation_bytes = dot_bracket_notation.encode("ascii")
+    except UnicodeEncodeError:
+        symbol = next(c for c in dot_bracket_notation if not c.isascii())
+        raise ValueError(f"'{symbol}' is an invalid character for DBL-notation")
+    cdef const unsigned char[:] notation = notation_bytes
+    cdef const int8[:] opening_table = _OPENING_TABLE
+    cdef const int8[:] closing_table = _CLOSING_TABLE
+
+    cdef int64 length = notation.shape[0]
+    # The position of the last opened bracket for each bracket type,
+    # that is not closed yet
+    cdef int64[:] top = np.full(len(_OPENING_BRACKETS), -1, dtype=np.int64)
+    # For each opening bracket the position of the previous opened
+    # bracket of the same type, that is not closed yet
+    # -> Each bracket type has a stack of opened positions,
+    # implemented as linked list
+    cdef int64[:] previous = np.empty(length, dtype=np.int64)
+    # For each opening bracket the position of the closing bracket
+    # As the opening positions are the indices, the base pairs are
+    # automatically sorted by their opening position
+    partners = np.full(length, -1, dtype=np.int64)
+    cdef int64[:] partners_v = partners
+
+    cdef int64 pos, opening_pos
+    cdef int8 index
+    cdef unsigned char symbol_code
     # Iterate through input string and extract base pairs
-    for pos, symbol in enumerate(dot_bracket_notation):
-        if symbol in _OPENING_BRACKETS:
-            # Add opening residues to list (separate list for each
-            # bracket type)
-            index = _OPENING_BRACKETS.index(symbol)
-            opened_brackets[index].append(pos)
-
-        elif symbol in _CLOSING_BRACKETS:
+    for pos in range(length):
+        symbol_code = notation[pos]
+        index = opening_table[symbol_code]
+        if index != -1:
+            # Push the opening position onto the stack
+            # corresponding to the bracket type
+            previous[pos] = top[index]
+            top[index] = pos
+            continue
+
+        index = closing_table[symbol_code]
+        if index != -1:
             # For each closing bracket, the the base pair consists out
-            # of the current index and the last index added to the list
-            # in `opened_brackets` corresponding to the same bracket
-            # type.
-            index = _CLOSING_BRACKETS.index(symbol)
-            basepairs.append((opened_brackets[index].pop(), pos))
-
-        else:
-            if symbol != ".":
-                raise ValueError(f"'{symbol}' is an invalid character for DBL-notation")
-
-    for not_closed in opened_brackets:
-        if not_closed != []:
+            # of the current index and the last opened position of the
+            # same bracket type
+            opening_pos = top[index]
+            if opening_pos == -1:
+                raise ValueError(
+                    "Invalid DBL-notation, not all closing brackets have an "
+                    "opening bracket"
+                )
+            top[index] = previous[opening_pos]
+            partners_v[opening_pos] = pos
+
+        elif symbol_code != ord("."):
+            raise ValueError(
+                f"'{chr(symbol_code)}' is an invalid character for DBL-notation"
+            )
+
+    for index in range(top.shape[0]):
+        if top[index] != -1:
             raise ValueError(
                 "Invalid DBL-notation, not all opening brackets have a "
                 "closing bracket"
             )
 
-    # Sort the base pair indices in ascending order
-    basepairs = np.array(basepairs)
-    if len(basepairs) > 0:
-        basepairs = basepairs[np.argsort(basepairs[:, 0])]
-    return basepairs
+    opening_positions = np.nonzero(partners != -1)[0]
+    return np.stack([opening_positions, partners[opening_positions]], axis=-1)
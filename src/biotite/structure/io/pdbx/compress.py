@@ -2,7 +2,10 @@ __all__ = ["compress"]
 __name__ = "biotite.structure.io.pdbx"
 __author__ = "Patrick Kunzmann"
 
+import hashlib
 import itertools
+import threading
+from collections import OrderedDict
 import msgpack
 import numpy as np
 import biotite.structure.io.pdbx.bcif as bcif
@@ -14,8 +17,24 @@ from biotite.structure.io.pdbx.encoding import (
     IntegerPackingEncoding,
     RunLengthEncoding,
     StringArrayEncoding,
+    TypeCode,
+    _get_string_offsets,
 )
 
+# Packers are reused for all size measurements, to avoid creating a new packer for
+# each call, but each thread needs its own one, as a packer uses an internal buffer
+_thread_local = threading.local()
+# The parameters of the encodings, which are not determined from the data
+# when the encoding is applied
+_FIXED_ENCODING_PARAMETERS = {
+    IntegerPackingEncoding: ["byte_count"],
+}
+# Maps the content of arrays to the best found encodings for them
+_compression_cache = OrderedDict()
+# Guards the cache, as 'compress()' may be called from multiple threads
+_compression_cache_lock = threading.Lock()
+_MAX_CACHE_SIZE = 256
+
 
 def compress(data, float_tolerance=1e-6):
     """
@@ -58,19 +77,11 @@ def compress(data, float_tolerance=1e-6):
     >>> print(f"{len(compressed_file.read()) // 1000} KB")
     111 KB
     """
-    match type(data):
-        case bcif.BinaryCIFFile:
-            return _compress_file(data, float_tolerance)
-        case bcif.BinaryCIFBlock:
-            return _compress_block(data, float_tolerance)
-        case bcif.BinaryCIFCategory:
-            return _compress_category(data, float_tolerance)
-        case bcif.BinaryCIFColumn:
-            return _compress_column(data, float_tolerance)
-        case bcif.BinaryCIFData:
-            return _compress_data(data, float_tolerance)
-        case _:
-            raise TypeError(f"Unsupported type {type(data).__name__}")
+    try:
+        compress_function = _compress_functions[type(data)]
+    except KeyError:
+        raise TypeError(f"Unsupported type {type(data).__name__}") from None
+    return compress_function(data, float_tolerance)
 
 
 def _compress_file(bcif_file, float_tolerance):
@@ -91,14 +102,23 @@ def _compress_block(bcif_block, float_tolerance):
 
 def _compress_category(bcif_category, float_tolerance):
     compressed_category = bcif.BinaryCIFCategory()
+    # Floating point columns in the same category often have the same number of
+    # decimal places (e.g. 'Cartn_x', 'Cartn_y' and 'Cartn_z')
+    # -> use the decimals of the previous one as hint for the next one
+    decimals = None
     for column_name, bcif_column in bcif_category.items():
-        compressed_column = _compress_column(bcif_column, float_tolerance)
+        array = bcif_column.data.array
+        if array.dtype.kind == "f" and len(array) != 1:
+            decimals = _get_decimal_places(array, float_tolerance, decimals)
+            compressed_column = _compress_column(bcif_column, float_tolerance, decimals)
+        else:
+            compressed_column = _compress_column(bcif_column, float_tolerance)
         compressed_category[column_name] = compressed_column
     return compressed_category
 
 
-def _compress_column(bcif_column, float_tolerance):
-    data = _compress_data(bcif_column.data, float_tolerance)
+def _compress_column(bcif_column, float_tolerance, decimals=None):
+    data = _compress_data(bcif_column.data, float_tolerance, decimals)
     if bcif_column.mask is not None:
         mask = _compress_data(bcif_column.mask, float_tolerance)
     else:
@@ -106,35 +126,39 @@ def _compress_column(bcif_column, float_tolerance):
     return bcif.BinaryCIFColumn(data, mask)
 
 
-def _compress_data(bcif_data, float_tolerance):
+def _compress_data(bcif_data, float_tolerance, decimals=None):
     array = bcif_data.array
     if len(array) == 1:
         # No need to compress a single value -> Use default uncompressed encoding
         return bcif.BinaryCIFData(array)
 
-    if np.issubdtype(array.dtype, np.str_):
+    # This function is called for each data array and 'np.issubdtype()' is
+    # comparably slow -> check the kind of the dtype directly
+    kind = array.dtype.kind
+    if kind == "U":
         # Leave encoding empty for now, as it is explicitly set later
         encoding = StringArrayEncoding(data_encoding=[], offset_encoding=[])
         # Run encode to initialize the data and offset arrays
         indices = encoding.encode(array)
-        offsets = np.cumsum([0] + [len(s) for s in encoding.strings])
+        offsets = _get_string_offsets(encoding.strings)
         encoding.data_encoding, _ = _find_best_integer_compression(indices)
         encoding.offset_encoding, _ = _find_best_integer_compression(offsets)
         return bcif.BinaryCIFData(array, [encoding])
 
-    elif np.issubdtype(array.dtype, np.floating):
-        to_integer_encoding = FixedPointEncoding(
-            10 ** _get_decimal_places(array, float_tolerance)
-        )
+    elif kind == "f":
+        if decimals is None:
+            decimals = _get_decimal_places(array, float_tolerance)
+        to_integer_encoding = FixedPointEncoding(10**decimals)
         integer_array = to_integer_encoding.encode(array)
         best_encoding, size_compressed = _find_best_integer_compression(integer_array)
-        if size_compressed < _data_size_in_file(bcif.BinaryCIFData(array)):
+        _, size_uncompressed = _byte_array_data_size(array)
+        if size_compressed < size_uncompressed:
             return bcif.BinaryCIFData(array, [to_integer_encoding] + best_encoding)
         else:
             # The float array is smaller -> encode it directly as bytes
             return bcif.BinaryCIFData(array, [ByteArrayEncoding()])
 
-    elif np.issubdtype(array.dtype, np.integer):
+    elif kind in ("i", "u"):
         array = _to_smallest_integer_type(array)
         encodings, _ = _find_best_integer_compression(array)
         return bcif.BinaryCIFData(array, encodings)
@@ -143,137 +167,354 @@ def _compress_data(bcif_data, float_tolerance):
         raise TypeError(f"Unsupported data type {array.dtype}")
 
 
+_compress_functions = {
+    bcif.BinaryCIFFile: _compress_file,
+    bcif.BinaryCIFBlock: _compress_block,
+    bcif.BinaryCIFCategory: _compress_category,
+    bcif.BinaryCIFColumn: _compress_column,
+    bcif.BinaryCIFData: _compress_data,
+}
+
+
 def _find_best_integer_compression(array):
     """
     Try different data encodings on an integer array and return the one that results in
     the smallest size.
+
+    The results are cached based on the content of the array, as often the same
+    data appears multiple times in a file (e.g. ``label_seq_id`` and ``auth_seq_id``).
+    """
+    n_bytes, size = _byte_array_data_size(array)
+    if n_bytes <= _MIN_ENCODING_SIZE:
+        # Any other encoding sequence adds at least one serialized encoding
+        # -> the data itself cannot shrink by more than this additional overhead
+        return [ByteArrayEncoding(array.dtype)], size
+
+    key = (
+        array.dtype.str,
+        array.shape,
+        hashlib.blake2b(np.ascontiguousarray(array), digest_size=16).digest(),
+    )
+    with _compression_cache_lock:
+        cached = _compression_cache.get(key)
+        if cached is not None:
+            # Mark as recently used to keep it from being evicted
+            _compression_cache.move_to_end(key)
+    if cached is not None:
+        encoding_recipe, size = cached
+        # Create new encodings, as the encoding objects hold their own state
+        return [cls(**params) for cls, params in encoding_recipe], size
+
+    encodings, size = _try_integer_compressions(array)
+    # Only store the type and the parameters that are not determined from the data
+    encoding_recipe = [
+        (
+            type(encoding),
+            {
+                param: getattr(encoding, param)
+                for param in _FIXED_ENCODING_PARAMETERS.get(type(encoding), [])
+            },
+        )
+        for encoding in encodings
+    ]
+    with _compression_cache_lock:
+        _compression_cache[key] = (encoding_recipe, size)
+        if len(_compression_cache) > _MAX_CACHE_SIZE:
+            # Remove the least recently used entry
+            _compression_cache.popitem(last=False)
+    return encodings, size
+
+
+def _try_integer_compressions(array):
+    """
+    Try different data encodings on an integer array and return the one that results in
+    the smallest size.
     """
     best_encoding_sequence = None
     smallest_size = np.inf
 
+    # The size of each serialized encoding is computed only once
+    # and shared between all trials that use the encoding
     for use_delta in [False, True]:
         if use_delta:
             encoding = DeltaEncoding()
             array_after_delta = encoding.encode(array)
             encodings_after_delta = [encoding]
+            sizes_after_delta = [_serialized_encoding_size(encoding)]
         else:
             encodings_after_delta = []
+            sizes_after_delta = []
             array_after_delta = array
         for use_run_length in [False, True]:
             # Use encoded data from previous step to save time
             if use_run_length:
+                # Each run results in a value and a length in the encoded array,
+                # each requiring at least one byte
+                # -> skip, if this lower bound cannot improve the best compression
+                n_runs = np.count_nonzero(np.diff(array_after_delta)) + 1
+                if 2 * n_runs >= smallest_size:
+                    continue
                 encoding = RunLengthEncoding()
                 array_after_rle = encoding.encode(array_after_delta)
                 encodings_after_rle = encodings_after_delta + [encoding]
+                sizes_after_rle = sizes_after_delta + [
+                    _serialized_encoding_size(encoding)
+                ]
             else:
                 encodings_after_rle = encodings_after_delta
+                sizes_after_rle = sizes_after_delta
                 array_after_rle = array_after_delta
+            # Determine the value range only once for all packing trials
+            min_val = array_after_rle.min().item()
+            max_val = array_after_rle.max().item()
+            is_unsigned = min_val >= 0
+            # Integer packing operates on 'int32' values
+            # -> values outside this range cannot be packed
+            int32_info = np.iinfo(np.int32)
+            is_packable = min_val >= int32_info.min and max_val <= int32_info.max
             for packed_byte_count in [None, 1, 2]:
+                # The packed array and the bytes are not created,
+                # as their size can be computed directly
                 if packed_byte_count is not None:
-                    # Quickly check this heuristic
-                    # to avoid computing an exploding packed data array
-                    if (
-                        _estimate_packed_length(array_after_rle, packed_byte_count)
-                        >= array_after_rle.nbytes
+                    if not is_packable:
+                        continue
+                    encoding = IntegerPackingEncoding(
+                        packed_byte_count,
+                        src_size=len(array_after_rle),
+                        is_unsigned=is_unsigned,
+                    )
+                    packed_info = np.iinfo(encoding._determine_packed_dtype())
+                    if (is_unsigned or min_val > packed_info.min) and (
+                        max_val < packed_info.max
                     ):
+                        # No value needs to be split into multiple packed values
+                        packed_length = len(array_after_rle)
+                    else:
+                        packed_length = encoding._get_encoded_length(array_after_rle)
+                    if packed_length * packed_byte_count >= array_after_rle.nbytes:
                         # Packing would not reduce the size
                         continue
-                    encoding = IntegerPackingEncoding(packed_byte_count)
-                    array_after_packing = encoding.encode(array_after_rle)
+                    packed_dtype = encoding._determine_packed_dtype()
                     encodings_after_packing = encodings_after_rle + [encoding]
+                    sizes_after_packing = sizes_after_rle + [
+                        _serialized_encoding_size(encoding)
+                    ]
                 else:
+                    packed_length = len(array_after_rle)
+                    packed_dtype = array_after_rle.dtype
                     encodings_after_packing = encodings_after_rle
-                    array_after_packing = array_after_rle
-                encoding = ByteArrayEncoding()
-                encoded_array = encoding.encode(array_after_packing)
+                    sizes_after_packing = sizes_after_rle
+                encoding = ByteArrayEncoding(packed_dtype)
                 encodings = encodings_after_packing + [encoding]
-                # Pack data directly instead of using the BinaryCIFData class
-                # to avoid the unnecessary re-encoding of the array,
-                # as it is already available in 'encoded_array'
-                serialized_encoding = [enc.serialize() for enc in encodings]
-                serialized_data = {
-                    "data": encoded_array,
-                    "encoding": serialized_encoding,
-                }
-                size = _data_size_in_file(serialized_data)
+                encoding_sizes = sizes_after_packing + [
+                    _serialized_encoding_size(encoding)
+                ]
+                n_bytes = packed_length * np.dtype(encoding.type.to_dtype()).itemsize
+                size = _serialized_data_size(n_bytes, encoding_sizes)
                 if size < smallest_size:
                     best_encoding_sequence = encodings
                     smallest_size = size
+                if packed_byte_count is not None and packed_length == len(
+                    array_after_rle
+                ):
+                    # All values fit into the packed type
+                    # -> a larger packed type would only increase the size
+                    break
     return best_encoding_sequence, smallest_size
 
 
-def _estimate_packed_length(array, packed_byte_count):
+def _to_smallest_integer_type(array):
     """
-    Estimate the length of an integer array after packing it with a given number of
-    bytes.
+    Convert an integer array to the smallest possible integer type, that is still able
+    to represent all values in the array.
 
     Parameters
     ----------
     array : numpy.ndarray
-        The array to pack.
-    packed_byte_count : int
-        The number of bytes used for packing.
+        The array to convert.
 
     Returns
     -------
-    length : int
-        The estimated length of the packed array.
+    array : numpy.ndarray
+        The converted array.
     """
-    # Use int64 to avoid integer overflow in the following line
-    max_val_per_element = np.int64(2 ** (8 * packed_byte_count))
-    n_bytes_per_element = packed_byte_count * (np.abs(array // max_val_per_element) + 1)
-    return np.sum(n_bytes_per_element, dtype=np.int64)
+    if array.dtype.kind == "u":
+        # Unsigned values cannot be negative -> no need to scan the array
+        min_val = 0
+    else:
+        min_val = int(array.min())
+    max_val = int(array.max())
+    if min_val >= 0:
+        candidate_dtypes = [np.uint8, np.uint16, np.uint32, np.uint64]
+    else:
+        candidate_dtypes = [np.int8, np.int16, np.int32, np.int64]
+    for dtype in candidate_dtypes:
+        info = np.iinfo(dtype)
+        if min_val >= info.min and max_val <= info.max:
+            return array.astype(dtype, copy=False)
+    raise ValueError("Array is out of bounds for all integer types")
 
 
-def _to_smallest_integer_type(array):
+def _byte_array_data_size(array):
     """
-    Convert an integer array to the smallest possible integer type, that is still able
-    to represent all values in the array.
+    Get the size of the data, it would have when written into a *BinaryCIF* file
+    without compression, i.e. only with a :class:`ByteArrayEncoding`.
 
     Parameters
     ----------
     array : numpy.ndarray
-        The array to convert.
+        The data array.
 
     Returns
     -------
-    array : numpy.ndarray
-        The converted array.
+    n_bytes : int
+        The length of the encoded data in bytes.
+    size : int
+        The size of the data array in the file in bytes.
     """
-    if array.min() >= 0:
-        for dtype in [np.uint8, np.uint16, np.uint32, np.uint64]:
-            if np.all(array <= np.iinfo(dtype).max):
-                return array.astype(dtype)
-    for dtype in [np.int8, np.int16, np.int32, np.int64]:
-        if np.all(array >= np.iinfo(dtype).min) and np.all(
-            array <= np.iinfo(dtype).max
-        ):
-            return array.astype(dtype)
-    raise ValueError("Array is out of bounds for all integer types")
+    encoding = ByteArrayEncoding(array.dtype)
+    n_bytes = len(array) * np.dtype(encoding.type.to_dtype()).itemsize
+    return n_bytes, _serialized_data_size(
+        n_bytes, [_serialized_encoding_size(encoding)]
+    )
 
 
-def _data_size_in_file(data):
+def _serialized_data_size(n_bytes, encoding_sizes):
     """
     Get the size of the data, it would have when written into a *BinaryCIF* file.
 
+    The size is computed without the potentially large encoded data, as only its
+    length is required.
+
     Parameters
     ----------
-    data : BinaryCIFData or dict
-        The data array whose size is measured.
-        Can be either a :class:`BinaryCIFData` object or already serialized data.
+    n_bytes : int
+        The length of the data in bytes after all encodings have been applied.
+    encoding_sizes : list of int
+        The size of each serialized encoding, as given by
+        :func:`_serialized_encoding_size()`.
 
     Returns
     -------
     size : int
         The size of the data array in the file in bytes.
     """
-    if isinstance(data, bcif.BinaryCIFData):
-        data = data.serialize()
-    bytes_in_file = msgpack.packb(data, use_bin_type=True, default=encode_numpy)
-    return len(bytes_in_file)
+    return (
+        _DATA_FRAME_SIZE
+        + _msgpack_bin_size(n_bytes)
+        + _msgpack_array_header_size(len(encoding_sizes))
+        + sum(encoding_sizes)
+    )
+
+
+def _serialized_encoding_size(encoding):
+    """
+    Get the size of an encoding, when it is serialized into a *BinaryCIF* file.
+
+    Parameters
+    ----------
+    encoding : Encoding
+        The encoding.
+        All its parameters must be set.
+
+    Returns
+    -------
+    size : int
+        The size of the serialized encoding in bytes.
+    """
+    return len(_get_packer().pack(encoding.serialize()))
 
 
-def _get_decimal_places(array, tol):
+def _get_packer():
+    """
+    Get the *MessagePack* packer of the current thread.
+
+    Returns
+    -------
+    packer : msgpack.Packer
+        The packer.
+    """
+    packer = getattr(_thread_local, "packer", None)
+    if packer is None:
+        packer = msgpack.Packer(use_bin_type=True, default=encode_numpy)
+        _thread_local.packer = packer
+    return packer
+
+
+def _msgpack_bin_size(length):
+    """
+    Get the size of a *MessagePack* binary object with the given number of bytes.
+
+    Parameters
+    ----------
+    length : int
+        The number of bytes in the binary object.
+
+    Returns
+    -------
+    size : int
+        The size of the serialized binary object including its header.
+    """
+    if length < 2**8:
+        # 'bin 8' format
+        return length + 2
+    elif length < 2**16:
+        # 'bin 16' format
+        return length + 3
+    else:
+        # 'bin 32' format
+        return length + 5
+
+
+def _msgpack_array_header_size(length):
+    """
+    Get the size of the header of a *MessagePack* array with the given number of
+    elements.
+
+    Parameters
+    ----------
+    length : int
+        The number of elements in the array.
+
+    Returns
+    -------
+    size : int
+        The size of the array header.
+    """
+    if length < 2**4:
+        # 'fixarray' format
+        return 1
+    elif length < 2**16:
+        # 'array 16' format
+        return 3
+    else:
+        # 'array 32' format
+        return 5
+
+
+# The minimum ratio between the float tolerance and the machine epsilon, for which
+# the rounding errors due to the floating point precision are negligible
+_PRECISION_TOLERANCE_FACTOR = 1000
+# The smallest possible size of a serialized encoding, that may precede the
+# ByteArrayEncoding in the compression trials
+_MIN_ENCODING_SIZE = min(
+    _serialized_encoding_size(encoding)
+    for encoding in [
+        DeltaEncoding(src_type=TypeCode.INT8, origin=0),
+        RunLengthEncoding(src_size=0, src_type=TypeCode.INT8),
+        IntegerPackingEncoding(byte_count=1, src_size=0, is_unsigned=True),
+    ]
+)
+# The size of the serialized BinaryCIFData, that is independent of the actual data
+# and encoding, i.e. the map including the keys
+_DATA_FRAME_SIZE = (
+    len(msgpack.packb({"data": b"", "encoding": []}, use_bin_type=True))
+    - _msgpack_bin_size(0)
+    - _msgpack_array_header_size(0)
+)
+
+
+def _get_decimal_places(array, tol, decimals_hint=None):
     """
     Get the number of decimal places in a floating point array.
 
@@ -284,6 +525,12 @@ def _get_decimal_places(array, tol):
     tol : float, optional
         The relative tolerance allowed when the values are cut off after the returned
         number of decimal places.
+    decimals_hint : int, optional
+        A guess for the number of decimal places, e.g. from a similar array.
+        If the guess is correct, it is verified with only two rounding passes.
+        Otherwise, it does not affect the result.
+        The hint is not used if the tolerance is close to the floating point
+        precision, as then more decimals may give a larger rounding error.
 
     Returns
     -------
@@ -293,10 +540,78 @@ def _get_decimal_places(array, tol):
     # Decimals of NaN or infinite values do not make sense
     # and 0 would give NaN when rounding on decimals
     array = array[np.isfinite(array) & (array != 0)]
-    for decimals in itertools.count(start=-_order_magnitude(array)):
-        error = np.abs(np.round(array, decimals) - array)
-        if np.all(error < tol * np.abs(array)):
-            return decimals
+    min_decimals = -_order_magnitude(array)
+    if len(array) == 0:
+        return min_decimals
+    max_error = tol * np.abs(array)
+
+    if tol < _PRECISION_TOLERANCE_FACTOR * np.finfo(array.dtype).eps:
+        # If the tolerance is close to the floating point precision, rounding to more
+        # decimals may give a larger error due to floating point inaccuracies
+        # -> check each number of decimals in ascending order
+        for decimals in itertools.count(start=min_decimals):
+            if _is_within_tolerance(array, decimals, max_error):
+                return decimals
+
+    if (
+        decimals_hint is not None
+        and decimals_hint >= min_decimals
+        and _is_within_tolerance(array, decimals_hint, max_error)
+        and (
+            decimals_hint == min_decimals
+            or not _is_within_tolerance(array, decimals_hint - 1, max_error)
+        )
+    ):
+        # As the rounding error does not grow with more decimals,
+        # the hint is the smallest number of decimals within the tolerance
+        return decimals_hint
+
+    # Rounding to 'd' decimals gives an absolute error of at most '0.5 * 10**(-d)'
+    # -> the value with the smallest magnitude gives an upper bound for the decimals
+    with np.errstate(divide="ignore", over="ignore"):
+        upper_bound = np.ceil(np.log10(0.5 / np.min(max_error))).item() + 1
+    if not np.isfinite(upper_bound):
+        upper_bound = min_decimals
+    max_decimals = max(min_decimals, int(upper_bound))
+    if not _is_within_tolerance(array, max_decimals, max_error):
+        # Upper bound is not reached due to floating point inaccuracies
+        # -> fall back to searching beyond the bound
+        for decimals in itertools.count(start=max_decimals + 1):
+            if _is_within_tolerance(array, decimals, max_error):
+                return decimals
+
+    # Otherwise, the rounding error can only decrease with more decimals
+    # -> binary search for the smallest number of decimals within the tolerance
+    while min_decimals < max_decimals:
+        decimals = (min_decimals + max_decimals) // 2
+        if _is_within_tolerance(array, decimals, max_error):
+            max_decimals = decimals
+        else:
+            min_decimals = decimals + 1
+    return min_decimals
+
+
+def _is_within_tolerance(array, decimals, max_error):
+    """
+    Check if all values in the array deviate less than the given maximum error from
+    their rounded values.
+
+    Parameters
+    ----------
+    array : ndarray, dtype=float
+        The values to check.
+    decimals : int
+        The number of decimals to round to.
+    max_error : ndarray, dtype=float
+        The maximum absolute error allowed for each value.
+
+    Returns
+    -------
+    is_within_tolerance : bool
+        True, if all rounded values are within the tolerance.
+    """
+    error = np.abs(np.round(array, decimals) - array)
+    return bool(np.all(error < max_error))
 
 
 def _order_magnitude(array):
@@ -325,7 +325,9 @@ class FixedPointEncoding(Encoding):
                 )
 
         # Round to avoid wrong values due to floating point inaccuracies
-        return np.round(data * self.factor).astype(np.int32)
+        # (in-place, to avoid another temporary array)
+        scaled_data = data * self.factor
+        return np.round(scaled_data, out=scaled_data).astype(np.int32)
 
     def decode(self, data):
         return (data / self.factor).astype(
@@ -681,6 +683,18 @@ class IntegerPackingEncoding(Encoding):
         else:
             raise ValueError("Unsupported byte count")
 
+    def _get_encoded_length(self, data):
+        """
+        Get the length of the array :meth:`encode()` would return for the
+        given data, without creating the packed array.
+        """
+        if self.is_unsigned is None:
+            self.is_unsigned = data.min().item() >= 0
+        info = np.iinfo(self._determine_packed_dtype())
+        return _get_packed_length(
+            data.astype(np.int32, copy=False), info.min, info.max
+        )
+
     @cython.cdivision(True)
     def _encode(self, const Integer[:] data, OutputInteger[:] output_type):
         """
@@ -693,25 +707,7 @@ class IntegerPackingEncoding(Encoding):
         cdef int min_val = np.iinfo(packed_type).min
         cdef int max_val = np.iinfo(packed_type).max
 
-        # Get length of output array
-        # by summing up required length of each element
-        cdef int number
-        cdef long length = 0
-        for i in range(data.shape[0]):
-            number = data[i]
-            if number < 0:
-                if min_val == 0:
-                    raise ValueError(
-                        "Cannot pack negative numbers into unsigned type"
-                    )
-                # The required packed length for an element is the
-                # number of times min_val/max_val need to be repeated
-                length += number // min_val + 1
-            elif number > 0:
-                length += number // max_val + 1
-            else:
-                # number = 0
-                length += 1
+        cdef long length = _get_packed_length(data, min_val, max_val)
 
         # Fill output
         cdef OutputInteger[:] output = np.zeros(length, dtype=packed_type)
@@ -846,7 +842,7 @@ class StringArrayEncoding(Encoding):
             )
 
         string_data = "".join(self.strings)
-        offsets = np.cumsum([0] + [len(s) for s in self.strings])
+        offsets = _get_string_offsets(self.strings)
 
         return {
             "kind": "StringArray",
@@ -1010,6 +1006,18 @@ def _snake_to_camel_case(attribute_name):
     return attribute_name[0].lower() + attribute_name[1:]
 
 
+def _get_string_offsets(strings):
+    """
+    Get the start index of each string in the concatenated strings,
+    including the exclusive stop index of the last string.
+    """
+    # Ensure a string array, as e.g. an empty list would be a float array
+    strings = np.asarray(strings, dtype=str)
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum(np.char.str_len(strings), out=offsets[1:])
+    return offsets
+
+
 def _safe_cast(array, dtype):
     dtype = np.dtype(dtype)
     if dtype == array.dtype:
@@ -1023,6 +1031,33 @@ def _safe_cast(array, dtype):
     return array.astype(dtype)
 
 
+@cython.cdivision(True)
+def _get_packed_length(const Integer[:] data, int min_val, int max_val):
+    """
+    Get the length of the given data after integer packing,
+    by summing up required length of each element.
+    """
+    cdef int i
+    cdef int number
+    cdef long length = 0
+    for i in range(data.shape[0]):
+        number = data[i]
+        if number < 0:
+            if min_val == 0:
+                raise ValueError(
+                    "Cannot pack negative numbers into unsigned type"
+                )
+            # The required packed length for an element is the
+            # number of times min_val/max_val need to be repeated
+            length += number // min_val + 1
+        elif number > 0:
+            length += number // max_val + 1
+        else:
+            # number = 0
+            length += 1
+    return length
+
+
 def _get_n_decimals(value, tolerance):
     MAX_DECIMALS = 10
     for n in range(MAX_DECIMALS):
@@ -4,6 +4,7 @@
 
 import glob
 from os.path import abspath, dirname, join
+import numpy as np
 import pytest
 import biotite.sequence as seq
 from tests.util import cannot_import
@@ -34,3 +35,36 @@ def test_load_color_scheme(scheme_path):
         if color is not None:
             # Should not raise error
             to_rgb(color)
+
+
+@pytest.mark.skipif(cannot_import("matplotlib"), reason="Matplotlib is not installed")
+def test_sequence_logo():
+    """
+    Check if the symbols of a sequence logo are stacked to the expected
+    heights, i.e. the maximum entropy subtracted by the positional
+    entropy.
+    """
+    import matplotlib.pyplot as plt
+    import biotite.sequence.graphics as graphics
+
+    alphabet = seq.NucleotideSequence.alphabet_unamb
+    # Fully conserved, two equally frequent symbols, all symbols
+    symbols = np.array([[4, 0, 0, 0], [2, 0, 2, 0], [1, 1, 1, 1]])
+    profile = seq.SequenceProfile(symbols, np.zeros(len(symbols), dtype=int), alphabet)
+    ref_stack_heights = [2, 1, 0]
+
+    fig, ax = plt.subplots()
+    graphics.plot_sequence_logo(ax, profile, scheme=["red", "green", "blue", "orange"])
+    (collection,) = ax.collections
+    paths = collection.get_paths()
+    # Only symbols with a height greater than zero are drawn
+    assert len(paths) == np.count_nonzero(symbols[:2])
+    test_stack_heights = np.zeros(len(symbols))
+    for path in paths:
+        extents = path.get_extents()
+        # Each symbol fits into its column
+        column = int(extents.x0 - 0.5)
+        assert extents.x1 <= column + 1.5
+        test_stack_heights[column] = max(test_stack_heights[column], extents.y1)
+    assert test_stack_heights.tolist() == pytest.approx(ref_stack_heights)
+    plt.close(fig)
@@ -4,7 +4,9 @@
 
 import glob
 import itertools
+import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from os.path import join, splitext
 import msgpack
@@ -16,7 +18,13 @@ import biotite.sequence as seq
 import biotite.structure as struc
 import biotite.structure.io.pdbx as pdbx
 from biotite.structure.io.pdbx.bcif import _encode_numpy as encode_numpy
+from biotite.structure.io.pdbx.compress import (
+    _byte_array_data_size as byte_array_data_size,
+)
 from biotite.structure.io.pdbx.compress import _get_decimal_places as get_decimal_places
+from biotite.structure.io.pdbx.compress import (
+    _serialized_data_size as serialized_data_size,
+)
 from tests.util import data_dir
 
 
@@ -617,6 +625,21 @@ def test_bcif_quantization_encoding():
     assert test_data.tolist() == approx(ref_data.tolist())
 
 
+@pytest.mark.parametrize(
+    "strings", [[], np.array([], dtype="U1"), ["", "a", "bcd"], np.array(["ab", "c"])]
+)
+def test_bcif_string_array_serialization(strings):
+    """
+    Check if a :class:`StringArrayEncoding` with given strings can be serialized and
+    deserialized again, including the edge case of no strings.
+    """
+    encoding = pdbx.StringArrayEncoding(strings=strings)
+
+    test_encoding = pdbx.StringArrayEncoding.deserialize(encoding.serialize())
+
+    assert test_encoding.strings.tolist() == list(strings)
+
+
 def test_bcif_cif_consistency():
     """
     Check if the decoded data from a BinaryCIF file is consistent with
@@ -830,26 +853,98 @@ def test_compress_file(path):
 
 
 @pytest.mark.parametrize(
-    "number, ref_decimals",
+    "number, dtype, tol, ref_decimals",
     [
-        (1.0, 0),
-        (1.2345, 4),
-        (0.00012345, 8),
-        (12300, -2),
-        (123.456, 3),
-        (123.0000000001, 0),
-        (0.0, 0),
+        (1.0, np.float64, 1e-6, 0),
+        (1.2345, np.float64, 1e-6, 4),
+        (0.00012345, np.float64, 1e-6, 8),
+        (12300, np.float64, 1e-6, -2),
+        (123.456, np.float64, 1e-6, 3),
+        (123.0000000001, np.float64, 1e-6, 0),
+        (0.0, np.float64, 1e-6, 0),
+        (1.2345, np.float32, 1e-6, 4),
+        # The tolerance is close to the 'float32' precision
+        # -> rounding to 9 decimals gives a larger error than rounding to 8 decimals
+        (-0.07354833, np.float32, 1e-7, 8),
     ],
 )
-def test_decimal_places(number, ref_decimals):
+def test_decimal_places(number, dtype, tol, ref_decimals):
     """
     Check if :func`:_get_decimal_places()` returns the correct number of decimal places
     for known examples.
     """
-    test_decimals = get_decimal_places(np.array([number]), 1e-6)
+    test_decimals = get_decimal_places(np.array([number], dtype=dtype), tol)
+    assert test_decimals == ref_decimals
+
+
+@pytest.mark.parametrize("decimals_hint", [-5, 0, 2, 3, 4, 10])
+def test_decimal_places_hint(decimals_hint):
+    """
+    Check if the hint given to :func`:_get_decimal_places()` does not affect the
+    result, regardless of whether the hint is correct or not.
+    """
+    array = np.array([1.234, -56.78, 0.001, 9000.0])
+    ref_decimals = get_decimal_places(array, 1e-6)
+
+    test_decimals = get_decimal_places(array, 1e-6, decimals_hint)
+
+    assert ref_decimals == 3
     assert test_decimals == ref_decimals
 
 
+def test_decimal_places_wrong_hint_near_precision():
+    """
+    Check if a too large hint given to :func`:_get_decimal_places()` is not accepted,
+    when more decimals may give a larger rounding error due to the tolerance being
+    close to the floating point precision.
+    """
+    array = np.array([-0.07354833], dtype=np.float32)
+
+    # 10 decimals are within the tolerance, but 9 decimals are not
+    test_decimals = get_decimal_places(array, 1e-7, decimals_hint=10)
+
+    assert test_decimals == 8
+
+
+@pytest.mark.parametrize("length", [0, 1, 2**8 - 1, 2**8, 2**16 - 1, 2**16])
+def test_serialized_data_size(length):
+    """
+    Check if :func:`_serialized_data_size()` gives the same size as the actual
+    serialized data, especially at the boundaries of the *MessagePack* binary formats.
+    """
+    data = pdbx.BinaryCIFData(np.zeros(length, dtype=np.uint8))
+    serialized_data = data.serialize()
+    ref_size = len(
+        msgpack.packb(serialized_data, use_bin_type=True, default=encode_numpy)
+    )
+
+    encoding_sizes = [
+        len(msgpack.packb(encoding, use_bin_type=True, default=encode_numpy))
+        for encoding in serialized_data["encoding"]
+    ]
+    test_size = serialized_data_size(len(serialized_data["data"]), encoding_sizes)
+
+    assert test_size == ref_size
+
+
+@pytest.mark.parametrize(
+    "dtype", [np.uint8, np.int16, np.int64, np.float16, np.float32, np.float64]
+)
+def test_byte_array_data_size(dtype):
+    """
+    Check if :func:`_byte_array_data_size()` gives the same size as the actual
+    serialized data without compression.
+    """
+    data = pdbx.BinaryCIFData(np.arange(1000).astype(dtype))
+    ref_size = len(
+        msgpack.packb(data.serialize(), use_bin_type=True, default=encode_numpy)
+    )
+
+    _, test_size = byte_array_data_size(data.array)
+
+    assert test_size == ref_size
+
+
 def _clear_encoding(category):
     columns = {}
     for key, col in category.items():
@@ -895,3 +990,81 @@ def test_writing_and_reading_extra_fields(tmpdir):
     assert np.all(
         atoms.get_annotation("my_custom_annotation").astype(int) == custom_annotation
     )
+
+
+@pytest.mark.parametrize(
+    "array",
+    [
+        # Values beyond 'int32', that can only be represented as 'uint32'
+        np.array([3_000_000_000, 3_000_000_001, 3_000_000_002, 7] * 20),
+        np.array([4_000_000_000] * 50 + [1, 2] * 30),
+        # Values at the edge of the 'int32' range
+        np.arange(2**31 - 100, 2**31 + 100),
+    ],
+)
+def test_compress_large_integers(array):
+    """
+    Check if integers outside the range of integer packing can be compressed and
+    restored.
+    """
+    compressed_data = pdbx.compress(pdbx.BinaryCIFData(array))
+    restored_data = pdbx.BinaryCIFData.deserialize(compressed_data.serialize())
+
+    assert restored_data.array.tolist() == array.tolist()
+
+
+def test_compression_cache_eviction():
+    """
+    Check if the cache of compression results keeps recently used entries, even if
+    they were inserted long ago.
+    """
+    compress_module = sys.modules["biotite.structure.io.pdbx.compress"]
+    compress_module._compression_cache.clear()
+    frequent_data = pdbx.BinaryCIFData(np.arange(100))
+
+    pdbx.compress(frequent_data)
+    (frequent_key,) = compress_module._compression_cache.keys()
+    for i in range(compress_module._MAX_CACHE_SIZE):
+        # Use the frequent data in between
+        pdbx.compress(frequent_data)
+        pdbx.compress(pdbx.BinaryCIFData(np.arange(100) + i + 1))
+
+    assert len(compress_module._compression_cache) == compress_module._MAX_CACHE_SIZE
+    assert frequent_key in compress_module._compression_cache
+
+
+def test_compress_concurrent():
+    """
+    Check if :func:`compress()` gives correct results, when it is called from
+    multiple threads, which share the cache of compression results.
+    """
+    # More different arrays than fit into the cache, to enforce evictions
+    arrays = [np.arange(100) + i for i in range(300)] * 4
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        compressed_data = list(
+            executor.map(lambda array: pdbx.compress(pdbx.BinaryCIFData(array)), arrays)
+        )
+
+    for array, data in zip(arrays, compressed_data):
+        restored_data = pdbx.BinaryCIFData.deserialize(data.serialize())
+        assert restored_data.array.tolist() == array.tolist()
+
+
+def test_compress_repeated_data():
+    """
+    Check if compressing the same data multiple times, as it happens when cached
+    compression results are used, gives independent and correctly decodable data.
+    """
+    array = np.repeat(np.arange(100), 10)
+    compressed_data = [
+        pdbx.compress(pdbx.BinaryCIFData(array.copy())) for _ in range(2)
+    ]
+
+    for enc_1, enc_2 in zip(compressed_data[0].encoding, compressed_data[1].encoding):
+        assert type(enc_1) is type(enc_2)
+        assert enc_1 is not enc_2
+    for data in compressed_data:
+        serialized_data = data.serialize()
+        restored_data = pdbx.BinaryCIFData.deserialize(serialized_data)
+        assert restored_data.array.tolist() == array.tolist()
@@ -110,3 +110,12 @@ def test_base_pairs_from_dot_bracket(basepair_residue_positions, expected_output
     for notation in expected_output:
         test_residue_positions = struc.base_pairs_from_dot_bracket(notation)
         assert np.all(test_residue_positions == basepair_residue_positions)
+
+
+@pytest.mark.parametrize("notation", ["(.x.)", "((..)", "..)(", "(.-)"])
+def test_invalid_dot_bracket(notation):
+    """
+    Check if invalid DBL-notations raise an exception.
+    """
+    with pytest.raises(ValueError):
+        struc.base_pairs_from_dot_bracket(notation)